@@ -18,6 +18,34 @@ def recipe_image_file_path(instance, filename):
     return os.path.join("uploads", "recipe", filename)
 
 
+class UserOwnedQuerySet(models.QuerySet):
+    """QuerySet for objects owned by a user"""
+
+    def for_user(self, user):
+        """Return the objects owned by the given user"""
+        return self.filter(user=user)
+
+
+class RecipeQuerySet(UserOwnedQuerySet):
+    """QuerySet for recipes"""
+
+    def for_user(self, user, related_fields=("id", "name")):
+        """Return the user's recipes with related_fields of their relations"""
+        return (
+            super()
+            .for_user(user)
+            .prefetch_related(
+                models.Prefetch(
+                    "tags", queryset=Tag.objects.only(*related_fields)
+                ),
+                models.Prefetch(
+                    "ingredients",
+                    queryset=Ingredient.objects.only(*related_fields),
+                ),
+            )
+        )
+
+
 class UserManager(BaseUserManager):
     """Manager for my custom user model"""
 
@@ -66,9 +94,15 @@ class Tag(models.Model):
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
+        db_index=False,
     )
     name = models.CharField(max_length=255)
 
+    objects = UserOwnedQuerySet.as_manager()
+
+    class Meta:
+        indexes = [models.Index(fields=["user", "-name"])]
+
     def __str__(self):
         """Returning string representation of our tag model"""
         return self.name
@@ -80,9 +114,15 @@ class Ingredient(models.Model):
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
+        db_index=False,
     )
     name = models.CharField(max_length=255)
 
+    objects = UserOwnedQuerySet.as_manager()
+
+    class Meta:
+        indexes = [models.Index(fields=["user", "-name"])]
+
     def __str__(self):
         """Returning string representation of our tag model"""
         return self.name
@@ -94,6 +134,7 @@ class Recipe(models.Model):
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
+        db_index=False,
     )
     title = models.CharField(max_length=255)
     time_minutes = models.IntegerField()
@@ -103,6 +144,11 @@ class Recipe(models.Model):
     tags = models.ManyToManyField("Tag")
     image = models.ImageField(null=True, upload_to=recipe_image_file_path)
 
+    objects = RecipeQuerySet.as_manager()
+
+    class Meta:
+        indexes = [models.Index(fields=["user", "-id"])]
+
     def __str__(self) -> str:
         """Returning string representation of our recipe model"""
         return self.title
@@ -1,16 +1,22 @@
 from django.contrib.auth import get_user_model
-from django.test import Client, TestCase
+from django.test import Client, TestCase, override_settings
 from django.urls import reverse
 
 
+User = get_user_model()
+
+
+@override_settings(
+    PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"]
+)
 class AdminSiteTests(TestCase):
     def setUp(self):
         self.client = Client()
-        self.admin_user = get_user_model().objects.create_superuser(
+        self.admin_user = User.objects.create_superuser(
             email="admin@test.com", password="admintest1234"
         )
         self.client.force_login(self.admin_user)
-        self.user = get_user_model().objects.create_user(
+        self.user = User.objects.create_user(
             email="user1@test.com", password="user1test1234", name="User1"
         )
 
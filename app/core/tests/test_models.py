@@ -2,51 +2,52 @@ from unittest.mock import patch
 
 from core import models
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.test import TestCase, override_settings
 
 
-def sample_user(email="test@test.com", password="testpass1234"):
+User = get_user_model()
+
+
+def sample_user(email="test@test.com", password=None):
     """Create a sample user"""
-    return get_user_model().objects.create_user(email, password)
+    return User.objects.create_user(email, password)
 
 
+@override_settings(
+    PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"]
+)
 class UserTests(TestCase):
     def test_create_user_with_email_successful(self):
         """Test creating a new user with an email is successful"""
         email = "test@test.com"
         password = "testpass123"
-        user = get_user_model().objects.create_user(
-            email=email, password=password
-        )
+        user = User.objects.create_user(email=email, password=password)
         self.assertEqual(user.email, email)
         self.assertTrue(user.check_password(password))
 
     def test_new_user_email_normalized(self):
         """Test the email for a new user is normalized"""
         email = "test@TEST.COM"
-        user = get_user_model().objects.create_user(
-            email=email, password="testpass123"
-        )
+        user = User.objects.create_user(email=email, password="testpass123")
         self.assertEqual(user.email, email.lower())
 
     def test_new_user_invalid_email(self):
         """Test creating user with no email raises error"""
         with self.assertRaises(ValueError):
-            get_user_model().objects.create_user(
-                email=None, password="testpass123"
-            )
+            User.objects.create_user(email=None, password="testpass123")
 
     def test_new_user_no_password(self):
         """Test creating user with no password is possible"""
         email = "test@test.com"
-        user = get_user_model().objects.create_user(email=email)
+        user = User.objects.create_user(email=email)
         self.assertEqual(user.email, email)
+        self.assertFalse(user.has_usable_password())
 
     def test_create_new_superuser(self):
         """Test creating a new superuser"""
         email = "super@test.com"
         password = "testpass1233"
-        superuser = get_user_model().objects.create_superuser(
+        superuser = User.objects.create_superuser(
             email=email, password=password
         )
         self.assertEqual(superuser.email, email)
@@ -83,6 +84,20 @@ class RecipeTests(TestCase):
 
         self.assertEqual(str(recipe), recipe.title)
 
+    def test_recipes_for_user(self):
+        """Test that for_user returns only the user's recipes"""
+        user = sample_user()
+        other_user = sample_user(email="other@test.com")
+        recipe = models.Recipe.objects.create(
+            user=user, title="Pancakes", time_minutes=5, price=5.00
+        )
+        models.Recipe.objects.create(
+            user=other_user, title="Waffles", time_minutes=5, price=5.00
+        )
+
+        recipes = models.Recipe.objects.for_user(user)
+        self.assertEqual(list(recipes), [recipe])
+
     @patch("uuid.uuid4")
     def test_recipe_file_name_uuid(self, mock_uuid):
         """Test that image is saved in the correct location"""
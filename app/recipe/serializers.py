@@ -1,4 +1,5 @@
 from core.models import Ingredient, Recipe, Tag
+from django.db.models import Manager, prefetch_related_objects
 from rest_framework import serializers
 
 
@@ -11,6 +12,15 @@ class TagSerializer(serializers.ModelSerializer):
         read_only_fields = ("id",)
 
 
+class TagCountSerializer(TagSerializer):
+    """Serializer for listing tag objects with their recipe count"""
+
+    recipe_count = serializers.IntegerField(read_only=True)
+
+    class Meta(TagSerializer.Meta):
+        fields = TagSerializer.Meta.fields + ("recipe_count",)
+
+
 class IngredientSerializer(serializers.ModelSerializer):
     """Serializer for ingredients objects"""
 
@@ -20,6 +30,15 @@ class IngredientSerializer(serializers.ModelSerializer):
         read_only_fields = ("id",)
 
 
+class IngredientCountSerializer(IngredientSerializer):
+    """Serializer for listing ingredients objects with their recipe count"""
+
+    recipe_count = serializers.IntegerField(read_only=True)
+
+    class Meta(IngredientSerializer.Meta):
+        fields = IngredientSerializer.Meta.fields + ("recipe_count",)
+
+
 class RecipeSerializer(serializers.ModelSerializer):
     """Serializer for recipes objects"""
 
@@ -46,6 +65,39 @@ class RecipeSerializer(serializers.ModelSerializer):
         read_only_fields = ("id",)
 
 
+class RecipeListSerializer(serializers.ListSerializer):
+    """Serializer for many recipes loading their relations in bulk"""
+
+    def to_representation(self, data):
+        """Prefetch recipe relations once before serializing the list"""
+        recipes = list(data.all() if isinstance(data, Manager) else data)
+        prefetch_related_objects(recipes, "tags", "ingredients")
+        return super().to_representation(recipes)
+
+
+class RecipeSummarySerializer(serializers.BaseSerializer):
+    """Read-only serializer for listing recipes without field binding"""
+
+    price_field = serializers.DecimalField(max_digits=5, decimal_places=2)
+
+    class Meta:
+        list_serializer_class = RecipeListSerializer
+
+    def to_representation(self, instance):
+        """Return the summary fields of a recipe"""
+        return {
+            "id": instance.id,
+            "title": instance.title,
+            "ingredients": [
+                ingredient.id for ingredient in instance.ingredients.all()
+            ],
+            "tags": [tag.id for tag in instance.tags.all()],
+            "time_minutes": instance.time_minutes,
+            "price": self.price_field.to_representation(instance.price),
+            "link": instance.link,
+        }
+
+
 class RecipeDetailSerializer(RecipeSerializer):
     """Serializer for a recipe detail"""
 
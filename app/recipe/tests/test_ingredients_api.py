@@ -1,4 +1,5 @@
 from django.contrib.auth import get_user_model
+from django.db.models import Count
 from django.urls import reverse
 from django.test import TestCase
 
@@ -6,12 +7,20 @@ from rest_framework import status
 from rest_framework.test import APIClient
 
 from core.models import Ingredient, Recipe
-from recipe.serializers import IngredientSerializer
+from recipe.serializers import IngredientCountSerializer
 
 
+User = get_user_model()
 INGREDIENTS_URL = reverse("recipe:ingredient-list")
 
 
+def with_recipe_count(ingredient):
+    """Return the ingredient annotated with its number of recipes"""
+    return Ingredient.objects.annotate(recipe_count=Count("recipe")).get(
+        id=ingredient.id
+    )
+
+
 class PublicIngredientsApiTests(TestCase):
     """Test the publicly available ingredients API"""
 
@@ -28,11 +37,11 @@ class PublicIngredientsApiTests(TestCase):
 class PrivateIngredientsApiTests(TestCase):
     """Test the authorized user ingredients API"""
 
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("test@test.com")
+
     def setUp(self):
-        self.user = get_user_model().objects.create_user(
-            "test@test.com",
-            "testpass1234",
-        )
         self.client = APIClient()
         self.client.force_authenticate(self.user)
 
@@ -41,8 +50,12 @@ class PrivateIngredientsApiTests(TestCase):
         Ingredient.objects.create(user=self.user, name="Egg")
         Ingredient.objects.create(user=self.user, name="Bacon")
 
-        ingredients = Ingredient.objects.all().order_by("-name")
-        serializer = IngredientSerializer(ingredients, many=True)
+        ingredients = list(
+            Ingredient.objects.annotate(recipe_count=Count("recipe"))
+            .filter(user=self.user)
+            .order_by("-name")
+        )
+        serializer = IngredientCountSerializer(ingredients, many=True)
 
         resp = self.client.get(INGREDIENTS_URL)
         self.assertEqual(resp.status_code, status.HTTP_200_OK)
@@ -50,18 +63,17 @@ class PrivateIngredientsApiTests(TestCase):
 
     def test_retrieve_ingredients_limited_to_user(self):
         """Test that returned ingredients are for the authenticated user"""
-        another_user = get_user_model().objects.create_user(
-            "test2@test.com",
-            "test2pass1234",
-        )
+        another_user = User.objects.create_user("test2@test.com")
         Ingredient.objects.create(user=self.user, name="Egg")
         Ingredient.objects.create(user=self.user, name="Bacon")
         Ingredient.objects.create(user=another_user, name="Rice")
 
-        ingredients = (
-            Ingredient.objects.all().order_by("-name").filter(user=self.user)
+        ingredients = list(
+            Ingredient.objects.annotate(recipe_count=Count("recipe"))
+            .filter(user=self.user)
+            .order_by("-name")
         )
-        serializer = IngredientSerializer(ingredients, many=True)
+        serializer = IngredientCountSerializer(ingredients, many=True)
 
         resp = self.client.get(INGREDIENTS_URL)
         self.assertEqual(resp.status_code, status.HTTP_200_OK)
@@ -78,6 +90,13 @@ class PrivateIngredientsApiTests(TestCase):
         ).exists()
         self.assertTrue(exists)
 
+    def test_create_ingredient_response_has_no_recipe_count(self):
+        """Test the created ingredient is returned without a recipe count"""
+        resp = self.client.post(INGREDIENTS_URL, {"name": "Test"})
+
+        self.assertEqual(resp.status_code, status.HTTP_201_CREATED)
+        self.assertNotIn("recipe_count", resp.data)
+
     def test_create_ingredient_invalid(self):
         """Test creating a new ingredient with invalid payload"""
         payload = {"name": ""}
@@ -101,8 +120,8 @@ class PrivateIngredientsApiTests(TestCase):
         recipe.ingredients.add(ingredient1)
 
         resp = self.client.get(INGREDIENTS_URL, {"assigned_only": 1})
-        serializer1 = IngredientSerializer(ingredient1)
-        serializer2 = IngredientSerializer(ingredient2)
+        serializer1 = IngredientCountSerializer(with_recipe_count(ingredient1))
+        serializer2 = IngredientCountSerializer(with_recipe_count(ingredient2))
         self.assertIn(serializer1.data, resp.data)
         self.assertNotIn(serializer2.data, resp.data)
 
@@ -124,8 +143,8 @@ class PrivateIngredientsApiTests(TestCase):
             time_minutes=30,
             price=15.00,
         )
-        recipe1.ingredients.add(ingredient)
-        recipe2.ingredients.add(ingredient)
+        ingredient.recipe_set.add(recipe1, recipe2)
 
         resp = self.client.get(INGREDIENTS_URL, {"assigned_only": 1})
         self.assertEqual(len(resp.data), 1)
+        self.assertEqual(resp.data[0]["recipe_count"], 2)
@@ -1,26 +1,54 @@
+import io
 import os
-import tempfile
+from unittest.mock import patch
 
 from core.models import Ingredient, Recipe, Tag
 from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import (
+    SimpleUploadedFile,
+    TemporaryUploadedFile,
+)
 from django.test import TestCase
 from django.urls import reverse
 from PIL import Image
-from recipe.serializers import RecipeDetailSerializer, RecipeSerializer
+from recipe.serializers import (
+    RecipeDetailSerializer,
+    RecipeImageSerializer,
+    RecipeSerializer,
+    RecipeSummarySerializer,
+)
 from rest_framework import status
 from rest_framework.test import APIClient
 
+User = get_user_model()
 RECIPES_URL = reverse("recipe:recipe-list")
+# Reverse once with a placeholder ID and format real IDs into the result
+RECIPE_DETAIL_URL = "{}".join(
+    reverse("recipe:recipe-detail", args=[0]).rsplit("0", 1)
+)
+RECIPE_UPLOAD_IMAGE_URL = "{}".join(
+    reverse("recipe:recipe-upload-image", args=[0]).rsplit("0", 1)
+)
+
+
+def _sample_jpeg():
+    """Return the bytes of a minimal JPEG image"""
+    buffer = io.BytesIO()
+    Image.new("L", (1, 1)).save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+SAMPLE_JPEG = _sample_jpeg()
 
 
 def image_upload_url(recipe_id):
     """Return URL for recipe image upload"""
-    return reverse("recipe:recipe-upload-image", args=[recipe_id])
+    return RECIPE_UPLOAD_IMAGE_URL.format(recipe_id)
 
 
 def detail_url(recipe_id):
     """Return recipe detail URL"""
-    return reverse("recipe:recipe-detail", args=[recipe_id])
+    return RECIPE_DETAIL_URL.format(recipe_id)
 
 
 def sample_tag(user, name="Sample Tag"):
@@ -44,6 +72,20 @@ def sample_recipe(user, **params):
     return Recipe.objects.create(user=user, **defaults)
 
 
+def bulk_sample_recipes(user, n, **params):
+    """Create and return n sample recipes in a single query"""
+    defaults = {
+        "time_minutes": 10,
+        "price": 5.00,
+    }
+    defaults.update(params)
+    recipes = [
+        Recipe(user=user, title=f"Sample recipe {i}", **defaults)
+        for i in range(n)
+    ]
+    return Recipe.objects.bulk_create(recipes, batch_size=500)
+
+
 class PublicRecipeApiTests(TestCase):
     """Test unauthenticated recipe API access"""
 
@@ -60,32 +102,28 @@ class PublicRecipeApiTests(TestCase):
 class PrivateRecipeApiTests(TestCase):
     """Test the authorized user recipe API"""
 
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("test@test.com")
+
     def setUp(self):
-        self.user = get_user_model().objects.create_user(
-            "test@test.com",
-            "testpass1234",
-        )
         self.client = APIClient()
         self.client.force_authenticate(self.user)
 
     def test_retrieve_recipes(self):
         """Test retrieving recipes"""
-        sample_recipe(user=self.user)
-        sample_recipe(user=self.user)
+        bulk_sample_recipes(user=self.user, n=2)
 
         recipes = Recipe.objects.all().order_by("-id")
         serializer = RecipeSerializer(recipes, many=True)
 
         resp = self.client.get(RECIPES_URL)
         self.assertEqual(resp.status_code, status.HTTP_200_OK)
-        self.assertEqual(resp.data, serializer.data)
+        self.assertEqual(resp.data["results"], serializer.data)
 
     def test_retrieve_recipes_limited_to_user(self):
         """Test that returned ingredients are for the authenticated user"""
-        another_user = get_user_model().objects.create_user(
-            "test2@test.com",
-            "test2pass1234",
-        )
+        another_user = User.objects.create_user("test2@test.com")
         sample_recipe(user=self.user)
         sample_recipe(user=another_user)
 
@@ -96,7 +134,33 @@ class PrivateRecipeApiTests(TestCase):
 
         resp = self.client.get(RECIPES_URL)
         self.assertEqual(resp.status_code, status.HTTP_200_OK)
-        self.assertEqual(resp.data, serializer.data)
+        self.assertEqual(resp.data["results"], serializer.data)
+
+    def test_retrieve_recipes_query_count(self):
+        """Test that listing recipes does not query per recipe"""
+        for i, recipe in enumerate(bulk_sample_recipes(self.user, 3)):
+            recipe.tags.add(sample_tag(self.user, f"Tag {i}"))
+            recipe.ingredients.add(sample_ingredient(self.user, f"Ing {i}"))
+
+        with self.assertNumQueries(3):
+            resp = self.client.get(RECIPES_URL)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        recipes = Recipe.objects.all().order_by("-id")
+        serializer = RecipeSerializer(recipes, many=True)
+        self.assertEqual(resp.data["results"], serializer.data)
+
+    def test_retrieve_recipes_paginated(self):
+        """Test that recipes are listed in pages following a cursor"""
+        bulk_sample_recipes(user=self.user, n=30)
+
+        resp = self.client.get(RECIPES_URL)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(resp.data["results"]), 25)
+        self.assertIsNone(resp.data["previous"])
+
+        resp = self.client.get(resp.data["next"])
+        self.assertEqual(len(resp.data["results"]), 5)
+        self.assertIsNone(resp.data["next"])
 
     def test_view_recipe_detail(self):
         """Test viewing a recipe detail"""
@@ -111,6 +175,18 @@ class PrivateRecipeApiTests(TestCase):
         self.assertEqual(resp.status_code, status.HTTP_200_OK)
         self.assertEqual(resp.data, serializer.data)
 
+    def test_view_recipe_detail_query_count(self):
+        """Test that a recipe detail loads its relations in bulk"""
+        recipe = sample_recipe(user=self.user)
+        recipe.tags.add(sample_tag(self.user, "Tag1"), sample_tag(self.user))
+        recipe.ingredients.add(sample_ingredient(self.user))
+
+        with self.assertNumQueries(3) as ctx:
+            resp = self.client.get(detail_url(recipe.id))
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertNotIn("core_user", ctx.captured_queries[0]["sql"])
+        self.assertEqual(len(resp.data["tags"]), 2)
+
     def test_create_basic_recipe(self):
         """Test creating a new basic recipe"""
         payload = {
@@ -169,10 +245,7 @@ class PrivateRecipeApiTests(TestCase):
 
     def test_create_recipe_with_other_user_tag(self):
         """Test creating a recipe with other_user_tag"""
-        another_user = get_user_model().objects.create_user(
-            "test2@test.com",
-            "test2pass1234",
-        )
+        another_user = User.objects.create_user("test2@test.com")
         tag1 = sample_tag(self.user, "Tag1")
         tag2 = sample_tag(another_user, "Tag2")
 
@@ -232,18 +305,35 @@ class PrivateRecipeApiTests(TestCase):
         self.assertEqual(recipe.title, payload["title"])
         self.assertEqual(recipe.time_minutes, payload["time_minutes"])
         self.assertEqual(recipe.price, payload["price"])
-        self.assertEqual(len(recipe.tags.all()), 0)
+        self.assertEqual(recipe.tags.count(), 0)
+
+
+class RecipeSummarySerializerTests(TestCase):
+    """Test serializing many recipes"""
+
+    def test_serialize_many_prefetches_relations(self):
+        """Test that tags and ingredients are loaded once for all recipes"""
+        user = User.objects.create_user("test@test.com")
+        for recipe in bulk_sample_recipes(user, 3):
+            recipe.tags.add(sample_tag(user))
+            recipe.ingredients.add(sample_ingredient(user))
+
+        recipes = Recipe.objects.all()
+        with self.assertNumQueries(3):
+            data = RecipeSummarySerializer(recipes, many=True).data
+        self.assertEqual(len(data), 3)
+        self.assertEqual(len(data[0]["tags"]), 1)
 
 
 class RecipeImageUploadTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("test@test.com")
+        cls.recipe = sample_recipe(user=cls.user)
+
     def setUp(self):
         self.client = APIClient()
-        self.user = get_user_model().objects.create_user(
-            "test@test.com",
-            "testpass1234",
-        )
         self.client.force_authenticate(self.user)
-        self.recipe = sample_recipe(user=self.user)
 
     def tearDown(self):
         self.recipe.image.delete()
@@ -251,33 +341,57 @@ class RecipeImageUploadTests(TestCase):
     def test_upload_image(self):
         """Test uploading an image to recipe"""
         url = image_upload_url(self.recipe.id)
-        with tempfile.NamedTemporaryFile(suffix=".jpg") as ntf:
-            img = Image.new("RGB", (10, 10))
-            img.save(ntf, format="JPEG")
-            ntf.seek(0)
-            resp = self.client.post(url, {"image": ntf}, format="multipart")
+        image = SimpleUploadedFile(
+            "test.jpg", SAMPLE_JPEG, content_type="image/jpeg"
+        )
+        with self.assertNumQueries(2):
+            resp = self.client.post(url, {"image": image}, format="multipart")
 
         self.recipe.refresh_from_db()
         self.assertEqual(resp.status_code, status.HTTP_200_OK)
         self.assertIn("image", resp.data)
         self.assertTrue(os.path.exists(self.recipe.image.path))
 
+    @patch.object(
+        RecipeImageSerializer,
+        "validate",
+        autospec=True,
+        side_effect=lambda serializer, attrs: attrs,
+    )
+    def test_upload_image_spooled_to_temporary_file(self, mock_validate):
+        """Test the uploaded image reaches the serializer as a temp file"""
+        url = image_upload_url(self.recipe.id)
+        image = SimpleUploadedFile(
+            "test.jpg", SAMPLE_JPEG, content_type="image/jpeg"
+        )
+        self.client.post(url, {"image": image}, format="multipart")
+
+        attrs = mock_validate.call_args.args[1]
+        self.assertIsInstance(attrs["image"], TemporaryUploadedFile)
+
     def test_upload_invalid_image(self):
         """Test uploading an invalid image"""
         url = image_upload_url(self.recipe.id)
         resp = self.client.post(url, {"image": "no_image"}, format="multipart")
         self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
 
+    def test_upload_missing_image(self):
+        """Test uploading without an image"""
+        url = image_upload_url(self.recipe.id)
+        resp = self.client.post(url, {}, format="multipart")
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(resp.data, {"image": ["No file was submitted."]})
+
 
 class RecipeFilterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("test@test.com")
+        cls.recipe = sample_recipe(user=cls.user)
+
     def setUp(self):
         self.client = APIClient()
-        self.user = get_user_model().objects.create_user(
-            "test@test.com",
-            "testpass1234",
-        )
         self.client.force_authenticate(self.user)
-        self.recipe = sample_recipe(user=self.user)
 
     def tearDown(self):
         self.recipe.image.delete()
@@ -289,8 +403,12 @@ class RecipeFilterTests(TestCase):
         recipe3 = sample_recipe(user=self.user, title="Recipe 3")
         tag1 = sample_tag(user=self.user, name="Tag 1")
         tag2 = sample_tag(user=self.user, name="Tag 2")
-        recipe1.tags.add(tag1)
-        recipe2.tags.add(tag2)
+        Recipe.tags.through.objects.bulk_create(
+            [
+                Recipe.tags.through(recipe=recipe1, tag=tag1),
+                Recipe.tags.through(recipe=recipe2, tag=tag2),
+            ]
+        )
 
         resp = self.client.get(RECIPES_URL, {"tags": f"{tag1.id},{tag2.id}"})
 
@@ -298,9 +416,9 @@ class RecipeFilterTests(TestCase):
         serializer2 = RecipeSerializer(recipe2)
         serializer3 = RecipeSerializer(recipe3)
 
-        self.assertIn(serializer1.data, resp.data)
-        self.assertIn(serializer2.data, resp.data)
-        self.assertNotIn(serializer3.data, resp.data)
+        self.assertIn(serializer1.data, resp.data["results"])
+        self.assertIn(serializer2.data, resp.data["results"])
+        self.assertNotIn(serializer3.data, resp.data["results"])
 
     def test_filter_recipes_by_ingredients(self):
         """Test returning recipes with specific tags"""
@@ -309,8 +427,16 @@ class RecipeFilterTests(TestCase):
         recipe3 = sample_recipe(user=self.user, title="Recipe 3")
         ingredient1 = sample_ingredient(user=self.user, name="Ingredient 1")
         ingredient2 = sample_ingredient(user=self.user, name="Ingredient 2")
-        recipe1.ingredients.add(ingredient1)
-        recipe2.ingredients.add(ingredient2)
+        Recipe.ingredients.through.objects.bulk_create(
+            [
+                Recipe.ingredients.through(
+                    recipe=recipe1, ingredient=ingredient1
+                ),
+                Recipe.ingredients.through(
+                    recipe=recipe2, ingredient=ingredient2
+                ),
+            ]
+        )
 
         resp = self.client.get(
             RECIPES_URL, {"ingredients": f"{ingredient1.id},{ingredient2.id}"}
@@ -320,6 +446,30 @@ class RecipeFilterTests(TestCase):
         serializer2 = RecipeSerializer(recipe2)
         serializer3 = RecipeSerializer(recipe3)
 
-        self.assertIn(serializer1.data, resp.data)
-        self.assertIn(serializer2.data, resp.data)
-        self.assertNotIn(serializer3.data, resp.data)
+        self.assertIn(serializer1.data, resp.data["results"])
+        self.assertIn(serializer2.data, resp.data["results"])
+        self.assertNotIn(serializer3.data, resp.data["results"])
+
+    def test_filter_recipes_unique(self):
+        """Test that filtering by several tags returns unique recipes"""
+        recipe = sample_recipe(user=self.user, title="Recipe 1")
+        tag1 = sample_tag(user=self.user, name="Tag 1")
+        tag2 = sample_tag(user=self.user, name="Tag 2")
+        ingredient = sample_ingredient(user=self.user, name="Ingredient 1")
+        recipe.tags.add(tag1, tag2)
+        recipe.ingredients.add(ingredient)
+
+        resp = self.client.get(
+            RECIPES_URL,
+            {"tags": f"{tag1.id},{tag2.id}", "ingredients": ingredient.id},
+        )
+
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(resp.data["results"]), 1)
+
+    def test_filter_recipes_invalid_ids(self):
+        """Test that malformed filter IDs are rejected"""
+        resp = self.client.get(RECIPES_URL, {"tags": "1,abc"})
+
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("tags", resp.data)
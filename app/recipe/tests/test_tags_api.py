@@ -1,4 +1,5 @@
 from django.contrib.auth import get_user_model
+from django.db.models import Count
 from django.urls import reverse
 from django.test import TestCase
 
@@ -6,12 +7,18 @@ from rest_framework import status
 from rest_framework.test import APIClient
 
 from core.models import Tag, Recipe
-from recipe.serializers import TagSerializer
+from recipe.serializers import TagCountSerializer
 
 
+User = get_user_model()
 TAGS_URL = reverse("recipe:tag-list")
 
 
+def with_recipe_count(tag):
+    """Return the tag annotated with its number of recipes"""
+    return Tag.objects.annotate(recipe_count=Count("recipe")).get(id=tag.id)
+
+
 class PublicTagsApiTests(TestCase):
     """Test the publicly available tags API"""
 
@@ -28,11 +35,11 @@ class PublicTagsApiTests(TestCase):
 class PrivateTagsApiTests(TestCase):
     """Test the authorized user tags API"""
 
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("test@test.com")
+
     def setUp(self):
-        self.user = get_user_model().objects.create_user(
-            "test@test.com",
-            "testpass1234",
-        )
         self.client = APIClient()
         self.client.force_authenticate(self.user)
 
@@ -41,8 +48,12 @@ class PrivateTagsApiTests(TestCase):
         Tag.objects.create(user=self.user, name="Vegan")
         Tag.objects.create(user=self.user, name="Drunken")
 
-        tags = Tag.objects.all().order_by("-name")
-        serializer = TagSerializer(tags, many=True)
+        tags = list(
+            Tag.objects.annotate(recipe_count=Count("recipe"))
+            .filter(user=self.user)
+            .order_by("-name")
+        )
+        serializer = TagCountSerializer(tags, many=True)
 
         resp = self.client.get(TAGS_URL)
         self.assertEqual(resp.status_code, status.HTTP_200_OK)
@@ -50,16 +61,17 @@ class PrivateTagsApiTests(TestCase):
 
     def test_retrieve_tags_limited_to_user(self):
         """Test that returned tags are for the authenticated user"""
-        another_user = get_user_model().objects.create_user(
-            "test2@test.com",
-            "test2pass1234",
-        )
+        another_user = User.objects.create_user("test2@test.com")
         Tag.objects.create(user=self.user, name="Vegan")
         Tag.objects.create(user=self.user, name="Drunken")
         Tag.objects.create(user=another_user, name="Meaty")
 
-        tags = Tag.objects.all().order_by("-name").filter(user=self.user)
-        serializer = TagSerializer(tags, many=True)
+        tags = list(
+            Tag.objects.annotate(recipe_count=Count("recipe"))
+            .filter(user=self.user)
+            .order_by("-name")
+        )
+        serializer = TagCountSerializer(tags, many=True)
 
         resp = self.client.get(TAGS_URL)
         self.assertEqual(resp.status_code, status.HTTP_200_OK)
@@ -76,6 +88,13 @@ class PrivateTagsApiTests(TestCase):
         ).exists()
         self.assertTrue(exists)
 
+    def test_create_tag_response_has_no_recipe_count(self):
+        """Test the created tag is returned without a recipe count"""
+        resp = self.client.post(TAGS_URL, {"name": "Test"})
+
+        self.assertEqual(resp.status_code, status.HTTP_201_CREATED)
+        self.assertNotIn("recipe_count", resp.data)
+
     def test_create_tag_invalid(self):
         """Test creating a new tag with invalid payload"""
         payload = {"name": ""}
@@ -97,8 +116,8 @@ class PrivateTagsApiTests(TestCase):
 
         resp = self.client.get(TAGS_URL, {"assigned_only": 1})
 
-        serializer1 = TagSerializer(tag1)
-        serializer2 = TagSerializer(tag2)
+        serializer1 = TagCountSerializer(with_recipe_count(tag1))
+        serializer2 = TagCountSerializer(with_recipe_count(tag2))
         self.assertIn(serializer1.data, resp.data)
         self.assertNotIn(serializer2.data, resp.data)
 
@@ -118,8 +137,8 @@ class PrivateTagsApiTests(TestCase):
             price=7.00,
             user=self.user,
         )
-        recipe1.tags.add(tag)
-        recipe2.tags.add(tag)
+        tag.recipe_set.add(recipe1, recipe2)
 
         resp = self.client.get(TAGS_URL, {"assigned_only": 1})
         self.assertEqual(len(resp.data), 1)
+        self.assertEqual(resp.data[0]["recipe_count"], 2)
@@ -1,20 +1,43 @@
+import re
+
 from core.models import Ingredient, Recipe, Tag
-from rest_framework import mixins, status, viewsets
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from django.db.models import Count, Exists, OuterRef
+from rest_framework import mixins, serializers, status, viewsets
 from rest_framework.authentication import TokenAuthentication
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import CursorPagination
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
 from recipe.serializers import (
+    IngredientCountSerializer,
     IngredientSerializer,
     RecipeDetailSerializer,
     RecipeImageSerializer,
     RecipeSerializer,
+    RecipeSummarySerializer,
+    TagCountSerializer,
     TagSerializer,
 )
 
+ID_LIST_RE = re.compile(r"\d+(?:,\d+)*")
+ID_LIST_MAX_LENGTH = 1024
+
+
+class RequestQuerysetMixin:
+    """Build the view's queryset once per request"""
+
+    def get_queryset(self):
+        """Return the queryset built for the current request"""
+        if not hasattr(self, "_request_queryset"):
+            self._request_queryset = self.build_queryset()
+        return self._request_queryset
+
 
 class BaseRecipeAttrViewset(
+    RequestQuerysetMixin,
     viewsets.GenericViewSet,
     mixins.ListModelMixin,
     mixins.CreateModelMixin,
@@ -23,68 +46,123 @@ class BaseRecipeAttrViewset(
 
     authentication_classes = (TokenAuthentication,)
     permission_classes = (IsAuthenticated,)
+    # Serializer adding the recipe count to listed objects
+    count_serializer_class = None
 
-    def get_queryset(self):
+    def _assigned_only(self):
+        """Return whether to list only objects assigned to recipes"""
+        return bool(int(self.request.query_params.get("assigned_only", 0)))
+
+    def build_queryset(self):
         """Return objects for the current authenticated user only"""
-        queryset = self.queryset
-        assigned_only = bool(
-            int(self.request.query_params.get("assigned_only", 0))
-        )
-        if assigned_only:
-            queryset = queryset.filter(recipe__isnull=False).order_by("-name")
-        return (
-            queryset.filter(user=self.request.user)
-            .order_by("-name")
-            .distinct()
-        )
+        queryset = self.queryset.annotate(recipe_count=Count("recipe"))
+        if self._assigned_only():
+            queryset = queryset.filter(recipe_count__gt=0)
+        return queryset.for_user(self.request.user).order_by("-name")
+
+    def get_serializer_class(self):
+        """Return the counting serializer for the list action"""
+        if self.action == "list":
+            return self.count_serializer_class
+        return self.serializer_class
 
     def perform_create(self, serializer):
         """Create a new object"""
         serializer.save(user=self.request.user)
 
 
-class TagViewSet(BaseRecipeAttrViewset):
-    """Manage tags in the database"""
-
-    queryset = Tag.objects.all()
-    serializer_class = TagSerializer
+def _make_attr_viewset(model, serializer_class, count_serializer_class):
+    """Return a viewset managing a recipe attribute model"""
+    return type(
+        f"{model.__name__}ViewSet",
+        (BaseRecipeAttrViewset,),
+        {
+            "__doc__": (
+                f"Manage {model._meta.verbose_name_plural} in the database"
+            ),
+            "queryset": model.objects.all(),
+            "serializer_class": serializer_class,
+            "count_serializer_class": count_serializer_class,
+        },
+    )
+
+
+TagViewSet = _make_attr_viewset(Tag, TagSerializer, TagCountSerializer)
+IngredientViewSet = _make_attr_viewset(
+    Ingredient, IngredientSerializer, IngredientCountSerializer
+)
 
 
-class IngredientViewSet(BaseRecipeAttrViewset):
-    """Manage ingredients in the database"""
+class RecipeCursorPagination(CursorPagination):
+    """Paginate recipes newest first by their primary key"""
 
-    queryset = Ingredient.objects.all()
-    serializer_class = IngredientSerializer
+    ordering = "-id"
+    page_size = 25
 
 
-class RecipeViewSet(viewsets.ModelViewSet):
+class RecipeViewSet(RequestQuerysetMixin, viewsets.ModelViewSet):
     """Manage recipes in the database"""
 
     queryset = Recipe.objects.all()
     serializer_class = RecipeSerializer
+    pagination_class = RecipeCursorPagination
     authentication_classes = (TokenAuthentication,)
     permission_classes = (IsAuthenticated,)
 
-    def _params_to_ints(self, query_string):
-        """Convert a list of string IDs to a list of integers"""
-        return [int(str_id) for str_id in query_string.split(",")]
+    def initialize_request(self, request, *args, **kwargs):
+        """Spool uploaded images straight to a temporary file"""
+        drf_request = super().initialize_request(request, *args, **kwargs)
+        if self.action == "upload_image":
+            request.upload_handlers = [TemporaryFileUploadHandler(request)]
+        return drf_request
+
+    def _params_to_ids(self, name, query_string):
+        """Validate a comma separated string of IDs and return them split"""
+        is_valid = len(query_string) <= ID_LIST_MAX_LENGTH and (
+            ID_LIST_RE.fullmatch(query_string)
+        )
+        if not is_valid:
+            raise ValidationError(
+                {name: ["Expected a comma separated list of IDs."]}
+            )
+        return query_string.split(",")
 
-    def get_queryset(self):
+    def build_queryset(self):
         """Return objects for the current authenticated user only"""
+        if self.action == "upload_image":
+            return self.queryset.filter(user=self.request.user).only(
+                "id", "image"
+            )
         tags = self.request.query_params.get("tags")
         ingredients = self.request.query_params.get("ingredients")
-        queryset = self.queryset.filter(user=self.request.user)
+        # The list only renders tag and ingredient IDs
+        related_fields = ("id",) if self.action == "list" else ("id", "name")
+        queryset = self.queryset.for_user(self.request.user, related_fields)
         if tags:
-            queryset = queryset.filter(tags__id__in=self._params_to_ints(tags))
+            tagged = Recipe.tags.through.objects.filter(
+                recipe_id=OuterRef("pk"),
+                tag_id__in=self._params_to_ids("tags", tags),
+            )
+            queryset = queryset.filter(Exists(tagged))
         if ingredients:
-            queryset = queryset.filter(
-                ingredients__id__in=self._params_to_ints(ingredients)
+            with_ingredient = Recipe.ingredients.through.objects.filter(
+                recipe_id=OuterRef("pk"),
+                ingredient_id__in=self._params_to_ids(
+                    "ingredients", ingredients
+                ),
+            )
+            queryset = queryset.filter(Exists(with_ingredient))
+        if self.action == "list":
+            queryset = queryset.only(
+                "id", "title", "time_minutes", "price", "link"
             )
-        return queryset.order_by("-id")
+        return queryset
 
     def get_serializer_class(self):
         """Return appropriate serializer class"""
-        if self.action == "retrieve":
+        if self.action == "list":
+            return RecipeSummarySerializer
+        elif self.action == "retrieve":
             return RecipeDetailSerializer
         elif self.action == "upload_image":
             return RecipeImageSerializer
@@ -97,6 +175,12 @@ class RecipeViewSet(viewsets.ModelViewSet):
     def upload_image(self, request, pk=None):
         """Upload an image to a recipe"""
         recipe = self.get_object()
+        if "image" not in request.data:
+            error = serializers.FileField.default_error_messages["required"]
+            return Response(
+                {"image": [error]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
         serializer = self.get_serializer(
             recipe,
             data=request.data,
@@ -1,19 +1,23 @@
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
 
 
+User = get_user_model()
 CREATE_USER_URL = reverse("user:create")
 TOKEN_URL = reverse("user:token")
 ME_URL = reverse("user:me")
 
 
 def create_user(**param):
-    return get_user_model().objects.create_user(**param)
+    return User.objects.create_user(**param)
 
 
+@override_settings(
+    PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"]
+)
 class PublicUserApiTests(TestCase):
     """Test the users API (public)"""
 
@@ -29,7 +33,7 @@ class PublicUserApiTests(TestCase):
         }
         resp = self.client.post(CREATE_USER_URL, payload)
         self.assertEqual(resp.status_code, status.HTTP_201_CREATED)
-        user = get_user_model().objects.get(**resp.data)
+        user = User.objects.get(email=resp.data["email"])
         self.assertTrue(user.check_password(payload["password"]))
         self.assertNotIn("password", resp.data)
 
@@ -51,9 +55,7 @@ class PublicUserApiTests(TestCase):
         }
         resp = self.client.post(CREATE_USER_URL, payload)
         self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
-        user_exists = (
-            get_user_model().objects.filter(email=payload["email"]).exists()
-        )
+        user_exists = User.objects.filter(email=payload["email"]).exists()
         self.assertFalse(user_exists)
 
     def test_create_token_for_user(self):
@@ -105,14 +107,30 @@ class PublicUserApiTests(TestCase):
         resp = self.client.get(ME_URL)
         self.assertEqual(resp.status_code, status.HTTP_401_UNAUTHORIZED)
 
+    def test_post_me_rejected_before_authentication(self):
+        """Test that POST on the me url is refused without authenticating"""
+        with self.assertNumQueries(0):
+            resp = self.client.post(
+                ME_URL, {}, HTTP_AUTHORIZATION="Token invalid"
+            )
+        self.assertEqual(resp.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+        self.assertEqual(resp.data, {"detail": 'Method "POST" not allowed.'})
+        self.assertEqual(resp["Content-Type"], "application/json")
+
 
+@override_settings(
+    PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"]
+)
 class PrivateUserApiTests(TestCase):
     """Test API requests that require authentication"""
 
-    def setUp(self):
-        self.user = create_user(
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user(
             email="test@test.com", password="testpass1234", name="Test User"
         )
+
+    def setUp(self):
         self.client = APIClient()
         self.client.force_authenticate(user=self.user)
 
@@ -133,6 +151,12 @@ class PrivateUserApiTests(TestCase):
         resp = self.client.post(ME_URL, {})
         self.assertEqual(resp.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
 
+    def test_post_me_not_allowed_honours_html_accept(self):
+        """Test that the 405 on the me url is content negotiated"""
+        resp = self.client.post(ME_URL, {}, HTTP_ACCEPT="text/html")
+        self.assertEqual(resp.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+        self.assertTrue(resp["Content-Type"].startswith("text/html"))
+
     def test_update_user_profile(self):
         """Test updating the user profile for authenticated user"""
         payload = {"name": "New User", "password": "testpass4567"}
@@ -1,4 +1,4 @@
-from rest_framework import generics, authentication, permissions
+from rest_framework import generics, authentication, exceptions, permissions
 from rest_framework.authtoken.views import ObtainAuthToken
 from rest_framework.settings import api_settings
 
@@ -24,6 +24,13 @@ class ManageUserView(generics.RetrieveUpdateAPIView):
     serializer_class = UserSerializer
     authentication_classes = (authentication.TokenAuthentication,)
     permission_classes = (permissions.IsAuthenticated,)
+    http_method_names = ["get", "put", "patch", "head", "options"]
+
+    def perform_authentication(self, request):
+        """Reject unsupported methods before authenticating the request"""
+        if request.method.lower() not in self.http_method_names:
+            raise exceptions.MethodNotAllowed(request.method)
+        super().perform_authentication(request)
 
     def get_object(self):
         """Retrieve and return authenticated user"""